@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Binary codec checks the JSON-only simulator in `run` cannot make: a
+neighbor socket here talks to a real router process over UDP.
+"""
+
+import importlib.machinery
+import importlib.util
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import unittest
+
+ROUTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "4700router")
+
+def load_router():
+  loader = importlib.machinery.SourceFileLoader("router", ROUTER)
+  spec = importlib.util.spec_from_loader("router", loader)
+  module = importlib.util.module_from_spec(spec)
+  loader.exec_module(module)
+  return module
+
+router = load_router()
+
+def decode(data):
+  return router.decodeMessage(data) if data[0] == router.BINARY_MAGIC else json.loads(data)
+
+class BinaryDataTest(unittest.TestCase):
+  """A router with a customer on 192.168.0.2 speaking binary and one on 10.0.0.2 speaking JSON."""
+  def setUp(self):
+    self.peer = self.neighbor()
+    self.json_peer = self.neighbor()
+    self.router = subprocess.Popen([sys.executable, ROUTER, "7",
+                                    "%d-192.168.0.2-cust" % self.peer.getsockname()[1],
+                                    "%d-10.0.0.2-cust" % self.json_peer.getsockname()[1]],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, self.router_addr = self.peer.recvfrom(65535)  # Handshakes
+    _, self.json_router_addr = self.json_peer.recvfrom(65535)
+
+  def tearDown(self):
+    self.router.kill()
+    self.router.wait()
+    self.peer.close()
+    self.json_peer.close()
+
+  def neighbor(self):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(5)
+    return sock
+
+  def receive(self, sock, type):
+    """The next message of type on sock, skipping the announcements forwarded meanwhile."""
+    while True:
+      message = decode(sock.recvfrom(65535)[0])
+      if message['type'] == type:
+        return message
+
+  def data(self, dst, payload):
+    header = router.HEADER.pack(router.BINARY_MAGIC, router.MESSAGE_CODES['data'],
+                                router.ipToInt("192.168.0.2"), router.ipToInt(dst))
+    self.peer.sendto(header + payload, self.router_addr)
+
+  def announce(self):
+    update = {"type": "update", "src": "10.0.0.2", "dst": "10.0.0.1",
+              "msg": {"network": "10.0.0.0", "netmask": "255.0.0.0", "localpref": 100,
+                      "ASPath": [2], "origin": "EGP", "selfOrigin": False}}
+    self.json_peer.sendto(json.dumps(update).encode('utf-8'), self.json_router_addr)
+    self.receive(self.peer, 'update')
+
+  def test_unroutable_data_with_opaque_payload(self):
+    self.data("10.0.0.25", b"\xff\xfe\x80 not json")
+    message = self.receive(self.peer, 'no route')
+    self.assertEqual(message['src'], "192.168.0.1")
+    self.assertEqual(message['dst'], "192.168.0.2")
+
+    # Still answering afterwards
+    self.data("10.0.0.25", b"\x00")
+    self.receive(self.peer, 'no route')
+    self.assertIsNone(self.router.poll())
+
+  def test_data_to_json_neighbor(self):
+    self.announce()
+    self.data("10.0.0.25", json.dumps({"ignore": "this"}).encode('utf-8'))
+    message = self.receive(self.json_peer, 'data')
+    self.assertEqual(message, {"type": "data", "src": "192.168.0.2", "dst": "10.0.0.25",
+                               "msg": {"ignore": "this"}})
+
+    # A payload a JSON neighbor cannot be given is refused, not dropped silently
+    self.data("10.0.0.25", b"\xff\xfe\x80 not json")
+    message = self.receive(self.peer, 'no route')
+    self.assertEqual(message['dst'], "192.168.0.2")
+    self.assertIsNone(self.router.poll())
+
+class CodecTest(unittest.TestCase):
+  def test_long_aspath(self):
+    path = list(range(1, 301))
+    entry = {'network': "10.0.0.0", 'netmask': "255.0.0.0", 'localpref': 100, 'selfOrigin': False,
+             'origin': 'EGP', 'peer': "192.168.0.2", 'ASPath': path}
+    self.assertEqual(router.unpackEntry(router.packEntry(entry), 0)[0], entry)
+
+    route = router.Route(router.ipToInt("10.0.0.0"), 8, 100, False, tuple(path), router.Origin.EGP,
+                         "192.168.0.2")
+    data = route.pack()
+    restored, offset = router.Route.unpackFrom(data, 0)
+    self.assertEqual(restored.ASPath, tuple(path))
+    self.assertEqual(offset, len(data))
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Multi-flow transfers, which the simulator in `run` cannot carry since it
+relays a single sender port: here a proxy between the processes keeps a
+separate path per flow and loses packets on only one of them.
+"""
+
+import os
+import random
+import re
+import select
+import socket
+import subprocess
+import sys
+import threading
+import time
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SENDER = os.path.join(HERE, "4700send")
+RECEIVER = os.path.join(HERE, "4700recv")
+
+class LossyProxy(threading.Thread):
+  """Relays each sender address through its own socket, dropping a share loss of the first flow's datagrams both ways."""
+  def __init__(self, receiver_port, loss):
+    super().__init__(daemon=True)
+    self.receiver = ("127.0.0.1", receiver_port)
+    self.loss = loss
+    self.random = random.Random(4700)
+    self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    self.socket.bind(("127.0.0.1", 0))
+    self.port = self.socket.getsockname()[1]
+    self.upstream, self.senders = {}, {}
+    self.lossy = None
+    self.running = True
+
+  def dropped(self, sender):
+    return sender == self.lossy and self.random.random() < self.loss
+
+  def run(self):
+    while self.running:
+      readable, _, _ = select.select([self.socket] + list(self.senders), [], [], 0.1)
+      for sock in readable:
+        if sock is self.socket:
+          data, sender = sock.recvfrom(65535)
+          if sender not in self.upstream:
+            upstream = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            upstream.bind(("127.0.0.1", 0))
+            self.upstream[sender], self.senders[upstream] = upstream, sender
+            self.lossy = self.lossy or sender
+          if not self.dropped(sender):
+            self.upstream[sender].sendto(data, self.receiver)
+        else:
+          data, _ = sock.recvfrom(65535)
+          if not self.dropped(self.senders[sock]):
+            self.socket.sendto(data, self.senders[sock])
+
+  def stop(self):
+    self.running = False
+    self.join()
+    for sock in [self.socket] + list(self.senders):
+      sock.close()
+
+class StreamsTest(unittest.TestCase):
+  def setUp(self):
+    self.output = open(os.devnull, "w")
+    self.received = subprocess.Popen([sys.executable, RECEIVER], stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE)
+    # The receiver reports its port on stderr before anything else
+    line = self.received.stderr.readline().decode()
+    self.proxy = LossyProxy(int(re.search(r"port (\d+)", line).group(1)), 0.05)
+    self.proxy.start()
+    threading.Thread(target=self.received.stderr.read, daemon=True).start()
+
+  def tearDown(self):
+    self.proxy.stop()
+    self.received.kill()
+    self.received.wait()
+    self.received.stdout.close()
+    self.received.stderr.close()
+    self.output.close()
+
+  def test_loss_on_one_flow(self):
+    data = random.Random(7).randbytes(3 << 20)
+    output = bytearray()
+    reader = threading.Thread(target=lambda: output.extend(self.received.stdout.read()), daemon=True)
+    reader.start()
+
+    sender = subprocess.Popen([sys.executable, SENDER, "127.0.0.1", str(self.proxy.port), "--streams", "2"],
+                              stdin=subprocess.PIPE, stderr=self.output)
+    sender.communicate(data, timeout=60)
+    self.assertEqual(sender.returncode, 0)
+    self.assertEqual(len(self.proxy.senders), 2)
+
+    # The receiver has written everything once the sender has its last ACK
+    time.sleep(0.5)
+    self.received.kill()
+    reader.join()
+    self.assertEqual(bytes(output), data)
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Sender checks the simulator in `run` cannot make, since it only runs the
+sender with its default flags and judges the transfer as a whole.
+"""
+
+import importlib.machinery
+import importlib.util
+import os
+import socket
+import sys
+import unittest
+
+SENDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "4700send")
+
+def load_sender():
+  loader = importlib.machinery.SourceFileLoader("sender", SENDER)
+  spec = importlib.util.spec_from_loader("sender", loader)
+  module = importlib.util.module_from_spec(spec)
+  loader.exec_module(module)
+  return module
+
+sender = load_sender()
+
+class UndoTest(unittest.TestCase):
+  def setUp(self):
+    self.peer = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    self.peer.bind(("127.0.0.1", 0))
+    self.stderr, sys.stderr = sys.stderr, open(os.devnull, "w")
+
+  def tearDown(self):
+    sys.stderr.close()
+    sys.stderr = self.stderr
+    self.peer.close()
+
+  def test_spurious_retransmission_restores_bbr(self):
+    s = sender.Sender("127.0.0.1", self.peer.getsockname()[1], cc="bbr")
+    for i in range(20):
+      s.cc.on_ack(2, i * 0.01, 0.01, 100 + i, False)
+    before = (list(s.cc.samples), s.cc.rounds, s.cc.delivered, s.cc.cwnd, s.cc.mode)
+
+    s.congestion_event(reordering=True)
+    # The live controller keeps learning while the loss is being decided
+    for i in range(20, 60):
+      s.cc.on_ack(2, i * 0.01, 0.01, 1000 + i, False)
+    s.spurious_retransmission()
+
+    self.assertEqual((list(s.cc.samples), s.cc.rounds, s.cc.delivered, s.cc.cwnd, s.cc.mode), before)
+    self.assertEqual(s.dup_thresh, sender.DUP_THRESH + 1)
+
+if __name__ == "__main__":
+  unittest.main()